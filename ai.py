@@ -1,8 +1,186 @@
+import atexit
 import enum
 import math
+import multiprocessing
+import os
 import time
 import numpy as np
 import random
+from numba import jit
+
+from game_board import BitBoard, moves_from_mask, move_bitboard, bitboard_moves_mask, count_empty_bitboard
+
+# Square root and square of each tile value, indexed by the nibble (log2 of the tile)
+TILE_SQRT = np.array([0.0] + [math.sqrt(1 << n) for n in range(1, 16)])
+TILE_SQUARE = np.array([0.0] + [float(1 << n) ** 2 for n in range(1, 16)])
+
+@jit("UniTuple(float64, 4)(uint64, int64)", nopython=True, cache=True)
+def eval_bitboard(b, n_empty):
+    """
+    Same heuristic as AI.eval_board, computed directly on a packed 4x4 board.
+    JIT-compiled so leaf evaluations never leave compiled code.
+    """
+    big_t = 0.0
+    smoothness = 0.0
+
+    for r in range(4):
+        for c in range(4):
+            n = (b >> np.uint64(16 * r + 4 * c)) & np.uint64(0xF)
+            big_t += TILE_SQUARE[n]
+
+            # Compare with the right and lower neighbours
+            if c < 3:
+                right = (b >> np.uint64(16 * r + 4 * c + 4)) & np.uint64(0xF)
+                smoothness -= abs(TILE_SQRT[n] - TILE_SQRT[right])
+            if r < 3:
+                below = (b >> np.uint64(16 * r + 4 * c + 16)) & np.uint64(0xF)
+                smoothness -= abs(TILE_SQRT[n] - TILE_SQRT[below])
+
+    empty_u = n_empty * 100000.0
+    smooth_u = smoothness ** 3
+
+    return (big_t + empty_u + smooth_u, empty_u, smooth_u, big_t)
+
+# Expectimax chance nodes this deep only place 2-tiles; a fixed depth keeps
+# cached results independent of the path that first reached a position
+CHANCE_SKIP_4_DEPTH = 3
+
+# Size of the transposition table of the compiled expectimax search (log2 of the entries)
+BITBOARD_TT_BITS = 18
+
+def new_bitboard_tt():
+    """Return an empty transposition table for search_bitboard as
+    (boards, tags, best moves, utilities) arrays; a tag of -1 marks a free slot."""
+    size = 1 << BITBOARD_TT_BITS
+    return (np.zeros(size, dtype=np.uint64), np.full(size, -1, dtype=np.int64),
+            np.zeros(size, dtype=np.int64), np.zeros(size))
+
+@jit("uint64(uint64, int64)", nopython=True, cache=True)
+def bitboard_tt_index(b, tag):
+    """
+    Slot of (board, tag) in the transposition table (Fibonacci hashing).
+    JIT-compiled for performance optimization.
+    """
+    h = (b ^ np.uint64(tag)) * np.uint64(0x9E3779B97F4A7C15)
+    return h >> np.uint64(64 - BITBOARD_TT_BITS)
+
+@jit("float64(uint64, int64, int64, boolean, int64, uint64[:], int64[:], int64[:], float64[:])",
+     nopython=True, nogil=True, cache=True)
+def search_bitboard(b, depth, max_depth, is_chance, max_chance_depth,
+                    tt_boards, tt_tags, tt_moves, tt_utilities):
+    """
+    Expectimax on a packed 4x4 board: AI.maximize when is_chance is False,
+    AI.chance otherwise, with the same move ordering and cutoffs.
+    Returns the utility of the node.
+
+    Both node types share one self-recursive function returning a float, as
+    numba cannot reload mutually recursive or tuple-returning recursive
+    functions from its cache. Children are always of the other node type, passed
+    as `not is_chance` since a literal bool would compile a separate specialization.
+    Entries are tagged with 32 * depth + 2 * remaining depth + is_chance, as the
+    chance cutoffs depend on the absolute depth; a colliding entry is simply
+    overwritten. Releases the GIL, so the game window stays responsive
+    while the AI searches in its worker thread.
+    JIT-compiled for performance optimization.
+    """
+    remaining = max_depth - depth
+
+    # Leaves are cheaper to evaluate than to look up
+    if not is_chance and remaining <= 0:
+        return eval_bitboard(b, count_empty_bitboard(b))[0]
+
+    tag = 32 * depth + 2 * remaining + (1 if is_chance else 0)
+    slot = bitboard_tt_index(b, tag)
+    if tt_tags[slot] == tag and tt_boards[slot] == b:
+        return tt_utilities[slot]
+
+    best_move = -1
+
+    if is_chance:
+        n_empty = count_empty_bitboard(b)
+
+        if n_empty >= 8 and depth >= max_chance_depth:
+            utility = eval_bitboard(b, n_empty)[0]
+        elif n_empty == 0:
+            utility = search_bitboard(b, depth + 1, max_depth, not is_chance, max_chance_depth,
+                                      tt_boards, tt_tags, tt_moves, tt_utilities)
+        else:
+            chance_2 = (.9 * (1 / n_empty))
+            chance_4 = (.1 * (1 / n_empty))
+
+            # 4-tiles are negligible this deep, renormalize over the 2-tiles only
+            skip_4 = depth >= CHANCE_SKIP_4_DEPTH
+            if skip_4:
+                chance_2 = 1 / n_empty
+
+            utility = 0.0
+            for i in range(16):
+                shift = np.uint64(4 * i)
+                if (b >> shift) & np.uint64(0xF) != 0:
+                    continue
+
+                utility += search_bitboard(b | (np.uint64(1) << shift), depth + 1, max_depth,
+                                           not is_chance, max_chance_depth,
+                                           tt_boards, tt_tags, tt_moves, tt_utilities) * chance_2
+                if not skip_4:
+                    utility += search_bitboard(b | (np.uint64(2) << shift), depth + 1, max_depth,
+                                               not is_chance, max_chance_depth,
+                                               tt_boards, tt_tags, tt_moves, tt_utilities) * chance_4
+    else:
+        mask = bitboard_moves_mask(b)
+        moves = np.empty(4, dtype=np.int64)
+        n_moves = 0
+        for m in range(4):
+            if mask & (1 << m):
+                moves[n_moves] = m
+                n_moves += 1
+
+        # Most promising moves first, as in AI.order_moves
+        if remaining > 2 and n_moves > 1:
+            scores = np.empty(4)
+            for k in range(n_moves):
+                after = move_bitboard(b, moves[k])
+                scores[k] = eval_bitboard(after, count_empty_bitboard(after))[0]
+
+            # Stable insertion sort, best score first
+            for k in range(1, n_moves):
+                m = moves[k]
+                score = scores[k]
+                j = k - 1
+                while j >= 0 and scores[j] < score:
+                    moves[j + 1] = moves[j]
+                    scores[j + 1] = scores[j]
+                    j -= 1
+                moves[j + 1] = m
+                scores[j + 1] = score
+
+            # The best move of the previous, shallower iteration goes first
+            prev_tag = 32 * depth + 2 * (remaining - 2)
+            prev_slot = bitboard_tt_index(b, prev_tag)
+            if tt_tags[prev_slot] == prev_tag and tt_boards[prev_slot] == b:
+                prev_move = tt_moves[prev_slot]
+                for k in range(n_moves):
+                    if moves[k] == prev_move:
+                        for j in range(k, 0, -1):
+                            moves[j] = moves[j - 1]
+                        moves[0] = prev_move
+                        break
+
+        utility = -np.inf
+        for k in range(n_moves):
+            u = search_bitboard(move_bitboard(b, moves[k]), depth + 1, max_depth, not is_chance,
+                                max_chance_depth, tt_boards, tt_tags, tt_moves, tt_utilities)
+
+            # Ties go to the earlier, better ordered move
+            if best_move == -1 or u > utility:
+                utility = u
+                best_move = moves[k]
+
+    tt_boards[slot] = b
+    tt_tags[slot] = tag
+    tt_moves[slot] = best_move
+    tt_utilities[slot] = utility
+    return utility
 
 class AIStrategy(enum.Enum):
     """Enumeration of available AI strategies."""
@@ -10,34 +188,140 @@ class AIStrategy(enum.Enum):
     MINIMAX = 2
     MCTS = 3
 
-class MCTSNode:
-    """Node representation for Monte Carlo Tree Search."""
-    def __init__(self, board, parent=None, move=None):
-        self.board = board
-        self.parent = parent
-        self.move = move
+class MCTSTree:
+    """Monte Carlo search tree stored as parallel lists indexed by node id (root is 0).
+    Avoids a Python object per node and keeps the fields read during selection together."""
+    def __init__(self, board):
+        self.boards = []
+        self.parent = []
+        self.move = []
         self.children = []
-        self.visits = 0
-        self.total_score = 0
-        self.untried_moves = board.get_available_moves()
+        self.untried = []  # bit mask of moves not expanded yet
+        self.visits = []
+        self.total_score = []
+        self.virtual_loss = []
+
+        # Cached sqrt(log(n)) and 1/sqrt(n) of the visit count used by select_child
+        self.sqrt_log_visits = []
+        self.inv_sqrt_visits = []
+
+        self.add_node(board, -1, None)
+
+    def add_node(self, board, parent, move):
+        """Append a node for board, reached from parent by move, and return its id."""
+        node = len(self.boards)
+        self.boards.append(board)
+        self.parent.append(parent)
+        self.move.append(move)
+        self.children.append([])
+        self.untried.append(board.available_moves_mask())
+        self.visits.append(0)
+        self.total_score.append(0.0)
+        self.virtual_loss.append(0)
+        self.sqrt_log_visits.append(0.0)
+        self.inv_sqrt_visits.append(0.0)
+
+        if parent >= 0:
+            self.children[parent].append(node)
+        return node
+
+    def select_child(self, node, exploration_constant=1.414, loss_value=0.0):
+        """Return the child with the highest UCT score.
+        Pending simulations (virtual loss) count as visits that scored loss_value."""
+        visits = self.visits
+        virtual_loss = self.virtual_loss
+        total_score = self.total_score
+        inv_sqrt_visits = self.inv_sqrt_visits
+        exploration = exploration_constant * self.sqrt_log_visits[node]
+
+        best_child = -1
+        best_score = float('-inf')
+
+        for child in self.children[node]:
+            n = visits[child] + virtual_loss[child]
+            if n == 0:
+                return child
+            score = (total_score[child] + virtual_loss[child] * loss_value) / n + \
+                    exploration * inv_sqrt_visits[child]
+            if score > best_score:
+                best_score = score
+                best_child = child
+
+        return best_child
+
+    def add_virtual_loss(self, node):
+        """Mark a pending simulation on the path from node to the root."""
+        while node >= 0:
+            self.virtual_loss[node] += 1
+
+            # Refresh the cached visit terms
+            n = self.visits[node] + self.virtual_loss[node]
+            self.sqrt_log_visits[node] = math.sqrt(math.log(n))
+            self.inv_sqrt_visits[node] = 1 / math.sqrt(n)
+
+            node = self.parent[node]
+
+    def backpropagate(self, node, result):
+        """Update visit counts and scores up the tree, replacing the pending virtual loss"""
+        while node >= 0:
+            # visits + virtual_loss is unchanged, so the cached visit terms stay valid
+            self.virtual_loss[node] -= 1
+            self.visits[node] += 1
+            self.total_score[node] += result
+            node = self.parent[node]
+
+    def root_visits(self):
+        """Return the visit count of each move from the root."""
+        return {self.move[child]: self.visits[child] for child in self.children[0]}
+
+# Number of leaves selected from one tree before their simulations are run
+MCTS_BATCH_SIZE = 4
+
+# Number of independent MCTS trees searched in parallel (root parallelization)
+MCTS_WORKERS = os.cpu_count() or 1
+
+_mcts_pool = None
+
+def _get_mcts_pool():
+    """Start the persistent MCTS worker pool on first use.
+    The workers are spawned rather than forked, since the game searches from a
+    worker thread and forking a multi-threaded process can deadlock. Each
+    spawned process seeds its own random state."""
+    global _mcts_pool
+    if _mcts_pool is None:
+        _mcts_pool = multiprocessing.get_context("spawn").Pool(MCTS_WORKERS)
+        atexit.register(_mcts_pool.terminate)
+    return _mcts_pool
 
-    def uct_score(self, exploration_constant=1.414):
-        """Calculate UCT score for node selection."""
-        if self.visits == 0:
-            return float('inf')
-        return (self.total_score / self.visits) + \
-               exploration_constant * math.sqrt(math.log(self.parent.visits) / self.visits)
+def _run_mcts_tree(args):
+    """Worker entry point: search one MCTS tree and return its root visit counts."""
+    board, time_budget, exploration_constant = args
+    return AI(AIStrategy.MCTS).mcts_root_visits(board, time_budget, exploration_constant)
 
 class AI:
     """AI class implementing different algorithms for playing 2048."""
     def __init__(self, strategy=AIStrategy.EXPECTIMAX):
         self.strategy = strategy
 
+        # Expectimax transposition tables: (board key, depth, remaining depth) -> result.
+        # The chance cutoffs depend on the absolute depth, so entries of a shallower
+        # deepening iteration only serve its best moves for move ordering
+        self._tt_max = {}
+        self._tt_chance = {}
+
+        # Transposition table of the compiled search on 4x4 boards, created on first use
+        self._bitboard_tt = None
+
+        # Chance depth limit for sparse boards, set at the root of each search (4x4 value)
+        self._max_chance_depth = 5
+
+        # Time after which a deepening iteration stops searching further root moves
+        self._deadline = None
+
     def get_move(self, board):
         """Select best move based on chosen strategy."""
         if self.strategy == AIStrategy.EXPECTIMAX:
-            best_move, _ = self.maximize(board, max_depth=3)
-            return best_move
+            return self.expectimax_move(board, time_budget=0.05)
         elif self.strategy == AIStrategy.MINIMAX:
             return self.minimax_move(board, max_depth=3)
         elif self.strategy == AIStrategy.MCTS:
@@ -47,26 +331,21 @@ class AI:
 
     def eval_board(self, board, n_empty): 
         """Evaluate board state based on multiple heuristics."""
+        if isinstance(board, BitBoard):
+            return eval_bitboard(board.board, n_empty)
+
         grid = board.grid
 
         utility = 0
-        smoothness = 0
 
         # Calculate total weighted tiles
-        big_t = np.sum(np.power(grid, 2))
+        big_t = (grid * grid).sum()
         
         # Calculate smoothness by comparing adjacent tiles
         s_grid = np.sqrt(grid)
         
-        # Horizontal smoothness
-        for i in range(grid.shape[0]):
-            for j in range(grid.shape[1]-1):
-                smoothness -= np.abs(s_grid[i,j] - s_grid[i,j+1])
-        
-        # Vertical smoothness
-        for j in range(grid.shape[1]):
-            for i in range(grid.shape[0]-1):
-                smoothness -= np.abs(s_grid[i,j] - s_grid[i+1,j])
+        # Horizontal and vertical smoothness
+        smoothness = -(np.abs(np.diff(s_grid, axis=1)).sum() + np.abs(np.diff(s_grid, axis=0)).sum())
         
         # Weights for different aspects of the board
         empty_w = 100000
@@ -83,93 +362,208 @@ class AI:
 
         return (utility, empty_u, smooth_u, big_t_u)
 
+    def expectimax_move(self, board, time_budget=0.05, min_depth=3, max_depth=9):
+        """Iterative deepening expectimax: always search min_depth, then deepen
+        while the next iteration is expected to fit in the time budget."""
+        start_time = time.perf_counter()
+
+        # Cached results are only valid for a single move, but are shared
+        # between iterations so deeper searches try the previous best moves first
+        self._tt_max.clear()
+        self._tt_chance.clear()
+        if isinstance(board, BitBoard):
+            if self._bitboard_tt is None:
+                self._bitboard_tt = new_bitboard_tt()
+            self._bitboard_tt[1].fill(-1)
+
+        # Each extra move ply multiplies the work by roughly moves * tile placements
+        growth = 2 * max(1, board.count_empty()) * len(board.get_available_moves())
+
+        best_move = None
+        last_duration = None
+
+        # A ply is a max and a chance level, so the depth grows by 2
+        for depth in range(min_depth, max_depth + 1, 2):
+            # Only deeper iterations may be cut short; their first root move
+            # is the previous best, so a partial result is still usable
+            self._deadline = None if depth == min_depth else start_time + time_budget
+
+            iteration_start = time.perf_counter()
+            move, _ = self.maximize(board, max_depth=depth)
+            if move is not None:
+                best_move = move
+
+            now = time.perf_counter()
+            duration = now - iteration_start
+            if last_duration:
+                growth = duration / last_duration
+            last_duration = duration
+
+            # Stop if the next, deeper search is not expected to finish in time
+            if now - start_time + duration * growth > time_budget:
+                break
+
+        return best_move
+
     def maximize(self, board, depth=0, max_depth=3):
         """Expectimax algorithm's maximizing step."""
+        if depth == 0:
+            # Depth limits adjusted based on grid complexity, fixed for the whole search
+            complexity_factor = board.grid_len / 4  # Normalize to 4x4 grid
+            self._max_chance_depth = max(3, int(5 / complexity_factor))
+
+        # Reuse the result if this position was already searched to the same depth
+        key = (board.key(), depth, max_depth - depth)
+        hit = self._tt_max.get(key)
+        if hit is not None:
+            return hit
+
         # Early termination if max depth reached
         if depth >= max_depth:
-            return None, self.eval_board(board, len(board.get_available_cells()))
+            result = None, self.eval_board(board, board.count_empty())
+            self._tt_max[key] = result
+            return result
         
         moves = board.get_available_moves()
-        moves_boards = []
 
-        for m in moves:
-            m_board = board.clone()
-            m_board.move(m)
-            moves_boards.append((m, m_board))
+        # Search the most promising moves first; not worth it close to the leaves
+        if max_depth - depth > 2 and len(moves) > 1:
+            moves = self.order_moves(board, moves, depth, max_depth - depth)
 
         max_utility = (float('-inf'),0,0,0)
         best_direction = None
+        complete = True
+
+        # Apply each move in place and undo it after the recursion
+        prev = board.snapshot()
 
-        for mb in moves_boards:
-            utility = self.chance(mb[1], depth + 1)
+        for m in moves:
+            # Out of time: keep the best of the root moves searched so far
+            if depth == 0 and best_direction is not None and \
+                    self._deadline is not None and time.perf_counter() > self._deadline:
+                complete = False
+                break
+
+            board.move(m)
+            utility = self.chance(board, depth + 1, max_depth)
+            board.restore(prev)
 
-            if utility[0] >= max_utility[0]:
+            # Ties go to the earlier, better ordered move
+            if best_direction is None or utility[0] > max_utility[0]:
                 max_utility = utility
-                best_direction = mb[0]
+                best_direction = m
 
+        if complete:
+            self._tt_max[key] = best_direction, max_utility
         return best_direction, max_utility
 
-    def chance(self, board, depth = 0):
+    def order_moves(self, board, moves, depth, remaining_depth):
+        """Order moves by static evaluation, putting the best move found by the
+        previous, shallower iteration first."""
+        prev = board.snapshot()
+        scored = []
+
+        for m in moves:
+            board.move(m)
+            scored.append((self.eval_board(board, board.count_empty())[0], m))
+            board.restore(prev)
+
+        scored.sort(key=lambda x: x[0], reverse=True)
+        ordered = [m for _, m in scored]
+
+        hit = self._tt_max.get((board.key(), depth, remaining_depth - 2))
+        if hit is not None and hit[0] in ordered:
+            ordered.remove(hit[0])
+            ordered.insert(0, hit[0])
+
+        return ordered
+
+    def chance(self, board, depth = 0, max_depth=3):
         """Expectimax algorithm's chance step."""
+        if isinstance(board, BitBoard):
+            # Below the root the search runs compiled; it only tracks the total utility
+            if self._bitboard_tt is None:
+                self._bitboard_tt = new_bitboard_tt()
+            utility = search_bitboard(board.board, depth, max_depth, True,
+                                      self._max_chance_depth, *self._bitboard_tt)
+            return (utility, 0.0, 0.0, 0.0)
+
+        key = (board.key(), depth, max_depth - depth)
+        hit = self._tt_chance.get(key)
+        if hit is not None:
+            return hit
+
         empty_cells = board.get_available_cells()
         n_empty = len(empty_cells)
 
-        # Depth limits adjusted based on grid complexity
-        complexity_factor = board.grid_len / 4  # Normalize to 4x4 grid
-        max_depth = max(3, int(5 / complexity_factor))
-
-        if n_empty >= board.grid_len * 2 and depth >= max_depth:
-            return self.eval_board(board, n_empty)
+        if n_empty >= board.grid_len * 2 and depth >= self._max_chance_depth:
+            utility = self.eval_board(board, n_empty)
+            self._tt_chance[key] = utility
+            return utility
 
         if n_empty == 0:
-            _, utility = self.maximize(board, depth + 1)
+            _, utility = self.maximize(board, depth + 1, max_depth)
+            self._tt_chance[key] = utility
             return utility
 
         possible_tiles = []
 
         chance_2 = (.9 * (1 / n_empty))
         chance_4 = (.1 * (1 / n_empty))
-        
-        for empty_cell in empty_cells:
-            possible_tiles.append((empty_cell, 2, chance_2))
-            possible_tiles.append((empty_cell, 4, chance_4))
+
+        if depth >= CHANCE_SKIP_4_DEPTH:
+            # 4-tiles are negligible this deep, renormalize over the 2-tiles only
+            for empty_cell in empty_cells:
+                possible_tiles.append((empty_cell, 2, 1 / n_empty))
+        else:
+            for empty_cell in empty_cells:
+                possible_tiles.append((empty_cell, 2, chance_2))
+                possible_tiles.append((empty_cell, 4, chance_4))
 
         utility_sum = [0, 0, 0, 0]
 
         for t in possible_tiles:
-            t_board = board.clone()
-            t_board.insert_tile(t[0], t[1])
-            _, utility = self.maximize(t_board, depth + 1)
+            # Place the tile, search, then clear the cell again
+            board.insert_tile(t[0], t[1])
+            _, utility = self.maximize(board, depth + 1, max_depth)
+            board.insert_tile(t[0], 0)
 
             for i in range(4):
                 utility_sum[i] += utility[i] * t[2]
 
-        return tuple(utility_sum)
+        utility = tuple(utility_sum)
+        self._tt_chance[key] = utility
+        return utility
 
     def minimax_move(self, board, max_depth=4):
         """Minimax algorithm for move selection."""
         def minimax(board, depth, is_maximizing):
-            # Check terminal conditions
-            if depth == 0 or len(board.get_available_moves()) == 0:
-                return self.eval_board(board, len(board.get_available_cells()))[0]
+            # Check terminal conditions; the mask is reused for the player's moves
+            moves_mask = board.available_moves_mask()
+            if depth == 0 or not moves_mask:
+                return self.eval_board(board, board.count_empty())[0]
             
             if is_maximizing:
                 # Player's turn (maximizing)
                 max_eval = float('-inf')
-                moves = board.get_available_moves()
+                moves = moves_from_mask[moves_mask]
+                
+                prev = board.snapshot()
                 
                 for move in moves:
-                    board_copy = board.clone()
-                    board_copy.move(move)
+                    board.move(move)
                     
                     # Simulate worst-case tile placement (always place 4)
-                    empty_cells = board_copy.get_available_cells()
+                    empty_cells = board.get_available_cells()
                     if empty_cells:
                         worst_tile_pos = empty_cells[0]  # Pessimistic approach
-                        board_copy.insert_tile(worst_tile_pos, 4)
+                        board.insert_tile(worst_tile_pos, 4)
                     
-                    eval_score = minimax(board_copy, depth - 1, False)
+                    eval_score = minimax(board, depth - 1, False)
                     max_eval = max(max_eval, eval_score)
+                    
+                    # Undo move and tile placement
+                    board.restore(prev)
                 
                 return max_eval
         
@@ -179,11 +573,12 @@ class AI:
                 empty_cells = board.get_available_cells()
                 
                 for cell in empty_cells:
-                    board_copy = board.clone()
-                    board_copy.insert_tile(cell, 4)  # Worst tile for player
+                    board.insert_tile(cell, 4)  # Worst tile for player
                     
-                    eval_score = minimax(board_copy, depth - 1, True)
+                    eval_score = minimax(board, depth - 1, True)
                     min_eval = min(min_eval, eval_score)
+                    
+                    board.insert_tile(cell, 0)
                 
                 return min_eval
     
@@ -192,18 +587,20 @@ class AI:
         best_move = None
         best_score = float('-inf')
         
+        prev = board.snapshot()
+        
         for move in moves:
-            board_copy = board.clone()
-            board_copy.move(move)
+            board.move(move)
             
             # Simulate worst-case tile placement
-            empty_cells = board_copy.get_available_cells()
+            empty_cells = board.get_available_cells()
             if empty_cells:
                 worst_tile_pos = empty_cells[0]
-                board_copy.insert_tile(worst_tile_pos, 4)
+                board.insert_tile(worst_tile_pos, 4)
             
             # Evaluate the move
-            score = minimax(board_copy, max_depth - 1, False)
+            score = minimax(board, max_depth - 1, False)
+            board.restore(prev)
             
             if score > best_score:
                 best_score = score
@@ -212,13 +609,29 @@ class AI:
         return best_move
 
     def mcts_move(self, board, time_budget=0.05, exploration_constant=1.414):   
-        """MCTS for move selection."""
+        """MCTS for move selection, searching one tree per CPU core and merging root visits."""
+        if MCTS_WORKERS <= 1:
+            visits = self.mcts_root_visits(board, time_budget, exploration_constant)
+        else:
+            args = [(board, time_budget, exploration_constant)] * MCTS_WORKERS
+            visits = {}
+            for tree_visits in _get_mcts_pool().map(_run_mcts_tree, args):
+                for move, n in tree_visits.items():
+                    visits[move] = visits.get(move, 0) + n
+
+        # Select best move based on most visited child across all trees
+        return max(visits, key=visits.get) if visits else None
+
+    def mcts_root_visits(self, board, time_budget=0.05, exploration_constant=1.414):
+        """Run a single MCTS tree and return the visit count of each root move."""
         def simulate_game(board):
             """Simulate a game from the current board state until no moves are possible."""
             simulation_board = board.clone()
-            while len(simulation_board.get_available_moves()) > 0:
-                move = random.choice(simulation_board.get_available_moves())
-                simulation_board.move(move)
+            while True:
+                mask = simulation_board.available_moves_mask()
+                if mask == 0:
+                    break
+                simulation_board.move(random.choice(moves_from_mask[mask]))
                 
                 # Add random tile
                 empty_cells = simulation_board.get_available_cells()
@@ -228,20 +641,22 @@ class AI:
                     simulation_board.insert_tile(tile_pos, tile_value)
             
             # Evaluate final board state
-            return self.eval_board(simulation_board, len(simulation_board.get_available_cells()))[0]
+            return self.eval_board(simulation_board, simulation_board.count_empty())[0]
     
-        def select_and_expand(node):
+        def select_and_expand(tree, loss_value):
             """Select a node to expand using UCT."""
-            while node.untried_moves == [] and node.children:
+            node = 0
+            while not tree.untried[node] and tree.children[node]:
                 # Use UCT to select child
-                node = max(node.children, key=lambda c: c.uct_score(exploration_constant))
+                node = tree.select_child(node, exploration_constant, loss_value)
             
-            if node.untried_moves:
+            untried = tree.untried[node]
+            if untried:
                 # Expand a new node
-                move = random.choice(node.untried_moves)
-                node.untried_moves.remove(move)
+                move = random.choice(moves_from_mask[untried])
+                tree.untried[node] = untried & ~(1 << move)
                 
-                new_board = node.board.clone()
+                new_board = tree.boards[node].clone()
                 new_board.move(move)
                 
                 # Add random tile
@@ -251,35 +666,34 @@ class AI:
                     tile_pos = random.choice(empty_cells)
                     new_board.insert_tile(tile_pos, tile_value)
                 
-                child = MCTSNode(new_board, parent=node, move=move)
-                node.children.append(child)
-                return child
+                return tree.add_node(new_board, node, move)
             
             return node
     
-        def backpropagate(node, result):
-            """Update visit counts and scores up the tree"""
-            while node is not None:
-                node.visits += 1
-                node.total_score += result
-                node = node.parent
-    
-        # Create root node
-        root = MCTSNode(board)
+        # Create tree with the root node
+        tree = MCTSTree(board)
+        
+        # Pending simulations are scored as the worst result seen so far (at most 0)
+        loss_value = 0.0
         
         # Run MCTS within time budget
         start_time = time.time()
         while time.time() - start_time < time_budget:
-            # Selection and expansion
-            leaf = select_and_expand(root)
+            # Selection and expansion of a batch of leaves, with virtual loss
+            # steering each descent away from the paths already taken
+            leaves = []
+            for _ in range(MCTS_BATCH_SIZE):
+                leaf = select_and_expand(tree, loss_value)
+                tree.add_virtual_loss(leaf)
+                leaves.append(leaf)
             
             # Simulation
-            simulation_result = simulate_game(leaf.board)
+            results = [simulate_game(tree.boards[leaf]) for leaf in leaves]
             
-            # Backpropagation
-            backpropagate(leaf, simulation_result)
-        
-        # Select best move based on most visited child
-        best_move = max(root.children, key=lambda c: c.visits).move if root.children else None
+            # Backpropagation, replacing the virtual loss with the real result
+            for leaf, simulation_result in zip(leaves, results):
+                tree.backpropagate(leaf, simulation_result)
+            
+            loss_value = min(loss_value, min(results))
         
-        return best_move
\ No newline at end of file
+        return tree.root_visits()
@@ -8,21 +8,24 @@ def generate_dirs(grid_len):
     """
     return list(range(4))
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def merge(a):
     """
-    Merges adjacent identical tiles in each row.
+    Merges adjacent identical tiles in each row, in place.
     When two identical values are adjacent, the first one doubles and the second becomes zero.
+    Returns the score of the merges (sum of the merged tile values).
     JIT-compiled for performance optimization.
     """
+    score = 0.0
     for i in range(a.shape[0]):
         for j in range(a.shape[1] - 1):
             if a[i][j] == a[i][j + 1] and a[i][j] != 0:
                 a[i][j] *= 2
                 a[i][j + 1] = 0   
-    return a
+                score += a[i][j]
+    return score
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def justify_left(a, out):
     """
     Shifts all non-zero values to the left side of each row,
@@ -37,44 +40,362 @@ def justify_left(a, out):
                 c += 1
     return out
 
-@jit(nopython=True)
-def get_available_from_zeros(a):
+@jit(nopython=True, cache=True)
+def get_available_from_grid(a):
     """
-    Determines possible moves based on zero positions.
+    Determines exactly which moves change the board by looking at adjacent pairs:
+    a tile next to an empty cell can slide, two equal tiles can merge.
     Returns a list of booleans representing possible moves:
     [up, down, left, right]
     JIT-compiled for performance optimization.
     """
     uc, dc, lc, rc = False, False, False, False
 
-    v_saw_0 = np.zeros(a.shape[1], dtype=np.bool_)
-    v_saw_1 = np.zeros(a.shape[1], dtype=np.bool_)
-
     for i in range(a.shape[0]):
-        saw_0 = False
-        saw_1 = False
-
         for j in range(a.shape[1]):
-            if a[i][j] == 0:
-                saw_0 = True
-                v_saw_0[j] = True
+            v = a[i][j]
 
-                if saw_1:
+            # Pair with the right neighbour
+            if j + 1 < a.shape[1]:
+                w = a[i][j + 1]
+                if v != 0 and v == w:
+                    lc = True
                     rc = True
-                if v_saw_1[j]:
-                    dc = True
-
-            if a[i][j] > 0:
-                saw_1 = True
-                v_saw_1[j] = True
-
-                if saw_0:
+                elif v == 0 and w != 0:
                     lc = True
-                if v_saw_0[j]:
+                elif v != 0 and w == 0:
+                    rc = True
+
+            # Pair with the lower neighbour
+            if i + 1 < a.shape[0]:
+                w = a[i + 1][j]
+                if v != 0 and v == w:
+                    uc = True
+                    dc = True
+                elif v == 0 and w != 0:
                     uc = True
+                elif v != 0 and w == 0:
+                    dc = True
 
     return [uc, dc, lc, rc]
 
+@jit(nopython=True, cache=True)
+def grid_has_moves(a):
+    """
+    Whether any move is possible: true as soon as an empty cell or two equal
+    adjacent tiles are found.
+    JIT-compiled for performance optimization.
+    """
+    for i in range(a.shape[0]):
+        for j in range(a.shape[1]):
+            v = a[i][j]
+            if v == 0:
+                return True
+            if j + 1 < a.shape[1] and a[i][j + 1] == v:
+                return True
+            if i + 1 < a.shape[0] and a[i + 1][j] == v:
+                return True
+    return False
+
+@jit(nopython=True, cache=True)
+def grid_max_tile(a):
+    """
+    Value of the highest tile of a grid.
+    JIT-compiled for performance optimization.
+    """
+    best = 0.0
+    for i in range(a.shape[0]):
+        for j in range(a.shape[1]):
+            if a[i][j] > best:
+                best = a[i][j]
+    return best
+
+# Zobrist keys for hashing array boards: one random 63-bit number per cell
+# (up to 10x10) and tile (log2 of the value, up to 2^31). They fit in int64,
+# so hashes pass to and from the kernels as plain ints
+ZOBRIST = np.random.default_rng(42).integers(0, 2**63, size=(100, 32), dtype=np.int64)
+ZOBRIST_KEYS = ZOBRIST.tolist()
+
+@jit(nopython=True, cache=True)
+def move_grid_left(a, z1, z2, cells, table, h):
+    """
+    Move the tiles of a left in place: justify, merge, justify again, using the
+    scratch grids z1 and z2. cells holds the index of each cell of a, which may be
+    an oriented view, to update the Zobrist hash h for the cells that change.
+    Returns the score of the merges, the new hash and whether any tile moved.
+    JIT-compiled so a move is a single call into compiled code.
+    """
+    z1[:] = 0
+    justify_left(a, z1)
+    score = merge(z1)
+    z2[:] = 0
+    justify_left(z1, z2)
+
+    # Write back the changed cells, XORing their old tile out of the hash and the new one in
+    changed = False
+    for i in range(a.shape[0]):
+        for j in range(a.shape[1]):
+            if a[i][j] != z2[i][j]:
+                changed = True
+                cell = cells[i][j]
+                if a[i][j] != 0:
+                    h ^= table[cell, int(np.log2(a[i][j]))]
+                if z2[i][j] != 0:
+                    h ^= table[cell, int(np.log2(z2[i][j]))]
+                a[i][j] = z2[i][j]
+
+    return score, h, changed
+
+def orient(a, dir):
+    """
+    View of a square array oriented so that a move in direction dir becomes a left move.
+    Writing through the view updates the array in its own orientation.
+    """
+    # UP: Transpose and reverse
+    if dir == 0:
+        return a[:,::-1].T
+    # DOWN: Reverse transpose
+    elif dir == 1:
+        return a.T[:,::-1]
+    # LEFT: Apply operations directly (left is our base operation)
+    elif dir == 2:
+        return a
+    # RIGHT: Double reverse
+    elif dir == 3:
+        return a[::-1,::-1]
+    return None
+
+# Cell indices (r * grid_len + c) oriented for each direction, per grid size
+oriented_cell_ids = {}
+
+def get_oriented_cell_ids(grid_len):
+    """
+    Return the cell indices of a grid oriented for each direction, built once per grid size.
+    """
+    ids = oriented_cell_ids.get(grid_len)
+    if ids is None:
+        cells = np.arange(grid_len * grid_len).reshape(grid_len, grid_len)
+        ids = [orient(cells, dir) for dir in range(4)]
+        oriented_cell_ids[grid_len] = ids
+    return ids
+
+def reverse_row(row):
+    """
+    Reverse the order of the four nibbles in a packed 16-bit row.
+    """
+    return ((row & 0xF) << 12) | (((row >> 4) & 0xF) << 8) | (((row >> 8) & 0xF) << 4) | (row >> 12)
+
+def build_row_tables():
+    """
+    Precompute the result of a left and a right move for every possible packed row.
+    A row holds four nibbles (log2 of the tile value, 0 for empty), column 0 in the
+    lowest nibble. Returns two lists of 65536 packed rows: (row_left_table, row_right_table),
+    and the score of the merges of a left move for every row: row_score_table.
+    """
+    row_left_table = [0] * 65536
+    row_right_table = [0] * 65536
+    row_score_table = [0] * 65536
+
+    for row in range(65536):
+        # Justify, merge each pair once from the left, justify again
+        tiles = [t for t in ((row >> s) & 0xF for s in (0, 4, 8, 12)) if t]
+        merged = []
+        score = 0
+        i = 0
+        while i < len(tiles):
+            if i + 1 < len(tiles) and tiles[i] == tiles[i + 1]:
+                merged.append(min(tiles[i] + 1, 15))
+                score += 1 << (tiles[i] + 1)
+                i += 2
+            else:
+                merged.append(tiles[i])
+                i += 1
+
+        result = 0
+        for k, t in enumerate(merged):
+            result |= t << (4 * k)
+        row_left_table[row] = result
+        row_score_table[row] = score
+
+    # A right move is a left move on the mirrored row
+    for row in range(65536):
+        row_right_table[row] = reverse_row(row_left_table[reverse_row(row)])
+
+    return row_left_table, row_right_table, row_score_table
+
+def unpack_col(row):
+    """
+    Spread the four nibbles of a packed row down the first column of a packed board.
+    """
+    return (row | (row << 12) | (row << 24) | (row << 36)) & 0x000F000F000F000F
+
+def build_move_tables():
+    """
+    Build the uint64 lookup tables used by the bitboard kernels:
+    row results of left/right moves, column results of up/down moves
+    (indexed by the column read as a row, top cell lowest), per-row
+    move flags (bit 0 set if a left move changes the row, bit 1 for right)
+    and per-row merge scores of left/right moves.
+    """
+    row_left, row_right, row_score = build_row_tables()
+    row_moves = [(row_left[row] != row) | ((row_right[row] != row) << 1) for row in range(65536)]
+
+    return (np.array(row_left, dtype=np.uint64),
+            np.array(row_right, dtype=np.uint64),
+            np.array([unpack_col(row) for row in row_left], dtype=np.uint64),
+            np.array([unpack_col(row) for row in row_right], dtype=np.uint64),
+            np.array(row_moves, dtype=np.int64),
+            np.array(row_score, dtype=np.int64),
+            np.array([row_score[reverse_row(row)] for row in range(65536)], dtype=np.int64))
+
+row_left_table, row_right_table, col_up_table, col_down_table, row_moves_table, \
+    row_left_score_table, row_right_score_table = build_move_tables()
+
+# Legal move directions for each 4-bit move mask (bit d set if direction d is legal)
+moves_from_mask = [tuple(d for d in range(4) if mask >> d & 1) for mask in range(16)]
+
+def build_empty_cells_tables():
+    """
+    For each row index r, map every packed row to the tuple of its empty cells (r, c).
+    Rows with the same empty columns share one tuple.
+    """
+    empty_cols = [tuple(c for c in range(4) if not (row >> (4 * c)) & 0xF) for row in range(65536)]
+    tables = []
+    for r in range(4):
+        cells_by_cols = {}
+        tables.append([cells_by_cols.setdefault(cols, tuple((r, c) for c in cols)) for cols in empty_cols])
+    return tables
+
+empty_cells_tables = build_empty_cells_tables()
+
+# uint64 constants for the bitboard kernels (mixing uint64 with int64 literals promotes to float)
+ROW_MASK = np.uint64(0xFFFF)
+SHIFT_4 = np.uint64(4)
+SHIFT_8 = np.uint64(8)
+SHIFT_12 = np.uint64(12)
+SHIFT_16 = np.uint64(16)
+SHIFT_24 = np.uint64(24)
+SHIFT_32 = np.uint64(32)
+SHIFT_48 = np.uint64(48)
+
+@jit("uint64(uint64)", nopython=True, cache=True)
+def transpose(b):
+    """
+    Transpose a packed 4x4 board so that columns become rows.
+    JIT-compiled for performance optimization.
+    """
+    a1 = b & np.uint64(0xF0F00F0FF0F00F0F)
+    a2 = b & np.uint64(0x0000F0F00000F0F0)
+    a3 = b & np.uint64(0x0F0F00000F0F0000)
+    a = a1 | (a2 << SHIFT_12) | (a3 >> SHIFT_12)
+    b1 = a & np.uint64(0xFF00FF0000FF00FF)
+    b2 = a & np.uint64(0x00FF00FF00000000)
+    b3 = a & np.uint64(0x00000000FF00FF00)
+    return b1 | (b2 >> SHIFT_24) | (b3 << SHIFT_24)
+
+@jit(nopython=True, cache=True)
+def move_rows(b, table):
+    """
+    Apply a row table to each of the four rows of a packed board.
+    JIT-compiled for performance optimization.
+    """
+    return table[b & ROW_MASK] | \
+           (table[(b >> SHIFT_16) & ROW_MASK] << SHIFT_16) | \
+           (table[(b >> SHIFT_32) & ROW_MASK] << SHIFT_32) | \
+           (table[b >> SHIFT_48] << SHIFT_48)
+
+@jit(nopython=True, cache=True)
+def move_cols(b, table):
+    """
+    Apply a column table to each of the four columns of a packed board.
+    JIT-compiled for performance optimization.
+    """
+    t = transpose(b)
+    return table[t & ROW_MASK] | \
+           (table[(t >> SHIFT_16) & ROW_MASK] << SHIFT_4) | \
+           (table[(t >> SHIFT_32) & ROW_MASK] << SHIFT_8) | \
+           (table[t >> SHIFT_48] << SHIFT_12)
+
+@jit("uint64(uint64, int64)", nopython=True, cache=True)
+def move_bitboard(b, dir):
+    """
+    Return the packed board after moving in the given direction
+    (0: Up, 1: Down, 2: Left, 3: Right). The board is returned unchanged
+    if the move is not possible.
+    JIT-compiled for performance optimization.
+    """
+    if dir == 0:
+        return move_cols(b, col_up_table)
+    elif dir == 1:
+        return move_cols(b, col_down_table)
+    elif dir == 2:
+        return move_rows(b, row_left_table)
+    elif dir == 3:
+        return move_rows(b, row_right_table)
+    return b
+
+@jit("int64(uint64)", nopython=True, cache=True)
+def bitboard_moves_mask(b):
+    """
+    Return the legal moves of a packed board as a bit mask, bit d set if
+    direction d is possible. Read from the row tables, no trial moves needed.
+    JIT-compiled for performance optimization.
+    """
+    rows = row_moves_table[b & ROW_MASK] | row_moves_table[(b >> SHIFT_16) & ROW_MASK] | \
+           row_moves_table[(b >> SHIFT_32) & ROW_MASK] | row_moves_table[b >> SHIFT_48]
+
+    # Columns read as rows: a left move is UP, a right move is DOWN
+    t = transpose(b)
+    cols = row_moves_table[t & ROW_MASK] | row_moves_table[(t >> SHIFT_16) & ROW_MASK] | \
+           row_moves_table[(t >> SHIFT_32) & ROW_MASK] | row_moves_table[t >> SHIFT_48]
+
+    return cols | (rows << 2)
+
+@jit("int64(uint64, int64)", nopython=True, cache=True)
+def bitboard_move_score(b, dir):
+    """
+    Return the score of moving a packed board in the given direction:
+    the sum of the tile values created by merges.
+    JIT-compiled for performance optimization.
+    """
+    # Columns read as rows: UP merges like a left move, DOWN like a right move
+    if dir == 0 or dir == 1:
+        b = transpose(b)
+    table = row_left_score_table if dir == 0 or dir == 2 else row_right_score_table
+
+    return table[b & ROW_MASK] + table[(b >> SHIFT_16) & ROW_MASK] + \
+           table[(b >> SHIFT_32) & ROW_MASK] + table[b >> SHIFT_48]
+
+@jit("int64(uint64)", nopython=True, cache=True)
+def bitboard_max_tile(b):
+    """
+    Return the value of the highest tile of a packed board.
+    JIT-compiled for performance optimization.
+    """
+    n = 0
+    for i in range(16):
+        t = np.int64((b >> np.uint64(4 * i)) & np.uint64(0xF))
+        if t > n:
+            n = t
+    return 1 << n if n else 0
+
+@jit("int64(uint64)", nopython=True, cache=True)
+def count_empty_bitboard(b):
+    """
+    Return the number of empty cells of a packed board.
+    JIT-compiled for performance optimization.
+    """
+    # Fold each nibble onto its lowest bit, which is then set only for empty cells
+    x = b | (b >> np.uint64(1))
+    x |= x >> np.uint64(2)
+    empty = ~x & np.uint64(0x1111111111111111)
+
+    # The multiplication sums the 16 flags into the top nibble, which overflows
+    # only when every cell is empty
+    if b == 0:
+        return 16
+    return (empty * np.uint64(0x1111111111111111)) >> np.uint64(60)
+
 class GameBoard:
     def __init__(self, grid_len=4):
         """
@@ -85,6 +406,14 @@ class GameBoard:
         self.grid = np.zeros((grid_len, grid_len))
         self.dirs = generate_dirs(grid_len)
 
+        # Zobrist hash of the grid, kept up to date by insert_tile and move
+        self.zhash = 0
+
+        # Scratch rows for move(), reused instead of allocated on every move
+        self._z1 = np.zeros((grid_len, grid_len))
+        self._z2 = np.zeros((grid_len, grid_len))
+        self._cell_ids = get_oriented_cell_ids(grid_len)
+
     def clone(self):
         """
         Create a deep copy of the current game board.
@@ -92,13 +421,52 @@ class GameBoard:
         """
         grid_copy = GameBoard(self.grid_len)
         grid_copy.grid = np.copy(self.grid)
+        grid_copy.zhash = self.zhash
         return grid_copy
 
+    def snapshot(self):
+        """
+        Capture the board state so it can be restored after a trial move.
+        Cheaper than clone() since no new board object is created.
+        """
+        return np.copy(self.grid), self.zhash
+
+    def restore(self, state):
+        """
+        Restore a state previously returned by snapshot().
+        The grid is copied back, as move() updates it in place.
+        """
+        grid, self.zhash = state
+        np.copyto(self.grid, grid)
+
+    def copy_from(self, other):
+        """
+        Copy the state of another board of the same size into this one.
+        Unlike clone() this reuses the board and its grid, nothing is allocated.
+        """
+        np.copyto(self.grid, other.grid)
+        self.zhash = other.zhash
+
+    def key(self):
+        """
+        Hashable key identifying the board position, used by the AI's transposition tables.
+        The Zobrist hash of the grid, so no bytes are copied per lookup.
+        """
+        return self.zhash
+
     def insert_tile(self, pos, value):
         """
         Insert a new tile at the specified position with the given value.
         Typically used to add 2 or 4 tiles after each move.
         """
+        # XOR the old tile out of the hash and the new one in
+        keys = ZOBRIST_KEYS[pos[0] * self.grid_len + pos[1]]
+        old = int(self.grid[pos[0]][pos[1]])
+        if old:
+            self.zhash ^= keys[old.bit_length() - 1]
+        if value:
+            self.zhash ^= keys[int(value).bit_length() - 1]
+
         self.grid[pos[0]][pos[1]] = value
 
     def get_available_cells(self):
@@ -106,71 +474,57 @@ class GameBoard:
         Find all empty cells (zeros) in the grid.
         Returns a list of (x,y) coordinates of empty cells.
         """
-        cells = []
-        for x in range(self.grid_len):
-            for y in range(self.grid_len):
-                if self.grid[x][y] == 0:
-                    cells.append((x,y))
-        return cells
+        xs, ys = np.nonzero(self.grid == 0)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def count_empty(self):
+        """
+        Number of empty cells, without building the list of their positions.
+        """
+        return int(np.count_nonzero(self.grid == 0))
 
     def get_max_tile(self):
         """
         Returns the value of the highest tile on the board.
         Used to track game progress and for evaluation.
         """
-        return np.amax(self.grid)
+        return grid_max_tile(self.grid)
 
-    def move(self, dir, get_avail_call=False):
+    def add_random_tile(self, rng):
+        """
+        Add a random tile (2 with 90% probability, 4 otherwise) to an empty cell,
+        drawing from the numpy Generator rng.
+        Returns False if there is no empty cell.
+        """
+        empties = np.flatnonzero(self.grid == 0)
+        if empties.size == 0:
+            return False
+
+        idx = int(empties[rng.integers(empties.size)])
+        self.insert_tile(divmod(idx, self.grid_len), 2 if rng.random() < 0.9 else 4)
+        return True
+
+    def move(self, dir):
         """
         Move tiles in the specified direction and merge when possible.
         
         Parameters:
         - dir: Direction (0: Up, 1: Down, 2: Left, 3: Right)
-        - get_avail_call: If True, returns whether the move changed the board
         
         Returns:
-        - Boolean indicating if the move changed the board state (if get_avail_call is True)
-        - None otherwise
-        """
-        if get_avail_call:
-            clone = self.clone()
-
-        z1 = np.zeros((self.grid_len, self.grid_len))
-        z2 = np.zeros((self.grid_len, self.grid_len))
-
-        # UP: Transpose and reverse, apply left operations, then reverse transpose
-        if dir == 0:
-            self.grid = self.grid[:,::-1].T
-            self.grid = justify_left(self.grid, z1)
-            self.grid = merge(self.grid)
-            self.grid = justify_left(self.grid, z2)
-            self.grid = self.grid.T[:,::-1]
-        # DOWN: Reverse transpose, apply left operations, then transpose reverse
-        elif dir == 1:
-            self.grid = self.grid.T[:,::-1]
-            self.grid = justify_left(self.grid, z1)
-            self.grid = merge(self.grid)
-            self.grid = justify_left(self.grid, z2)
-            self.grid = self.grid[:,::-1].T
-        # LEFT: Apply operations directly (left is our base operation)
-        elif dir == 2:
-            self.grid = justify_left(self.grid, z1)
-            self.grid = merge(self.grid)
-            self.grid = justify_left(self.grid, z2)
-        # RIGHT: Double reverse, apply left operations, then double reverse again
-        elif dir == 3:
-            self.grid = self.grid[:,::-1]
-            self.grid = self.grid[::-1,:]
-            self.grid = justify_left(self.grid, z1)
-            self.grid = merge(self.grid)
-            self.grid = justify_left(self.grid, z2)
-            self.grid = self.grid[:,::-1]
-            self.grid = self.grid[::-1,:]
-
-        if get_avail_call:
-            return not (clone.grid == self.grid).all()
-        else:
-            return None
+        - Boolean indicating if the move changed the board state
+        - The score earned from merges during this move
+        """
+        # Writing the result through the oriented view moves the grid in place,
+        # no reverse transform needed
+        view = orient(self.grid, dir)
+
+        if view is None:
+            return False, 0
+
+        score, self.zhash, changed = move_grid_left(view, self._z1, self._z2, self._cell_ids[dir],
+                                                    ZOBRIST, self.zhash)
+        return changed, score
 
     def get_available_moves(self, dirs=None):
         """
@@ -182,45 +536,188 @@ class GameBoard:
         
         available_moves = []
         
-        a1 = get_available_from_zeros(self.grid)
+        a1 = get_available_from_grid(self.grid)
 
         for x in dirs:
-            if not a1[x]:
-                board_clone = self.clone()
-
-                if board_clone.move(x, True):
-                    available_moves.append(x)
-
-            else:
+            if a1[x]:
                 available_moves.append(x)
 
         return available_moves
 
+    def available_moves_mask(self):
+        """
+        Return the legal moves as a bit mask, bit d set if direction d is possible.
+        """
+        a1 = get_available_from_grid(self.grid)
+
+        mask = 0
+        for x in range(4):
+            if a1[x]:
+                mask |= 1 << x
+        return mask
+
+    def has_moves(self):
+        """
+        Whether any move is possible, stopping at the first one found.
+        """
+        return grid_has_moves(self.grid)
+
     def get_cell_value(self, pos):
         """
         Get the value of the tile at the specified position.
         """
         return self.grid[pos[0]][pos[1]]
-    
-    def calculate_move_score(self, original_grid):
+
+class BitBoard(GameBoard):
+    def __init__(self, board=0):
         """
-        Calculate score earned from a move by comparing with the original grid.
-        Scores are based on the values of merged tiles.
-        
-        Parameters:
-        - original_grid: The grid state before the move
-        
-        Returns:
-        - The score earned from merges during this move
+        Initialize a 4x4 board packed into a single 64-bit integer.
+        Each cell is a nibble holding log2 of the tile value (0 for empty),
+        cell (r, c) lives at nibble 4*r + c.
         """
-        score = 0
-        for i in range(self.grid_len):
-            for j in range(self.grid_len):
-                current_value = self.grid[i][j]
-                original_value = original_grid[i][j]
-                
-                # If current value is larger and not zero, it means a merge happened
-                if current_value > original_value and current_value != 0:
-                    score += current_value
-        
-        return score
\ No newline at end of file
+        self.grid_len = 4
+        self.board = board
+        self.dirs = generate_dirs(4)
+
+    @property
+    def grid(self):
+        """
+        Decode the packed board into a 4x4 array of tile values.
+        """
+        b = self.board
+        grid = np.zeros((4, 4))
+        for i in range(16):
+            n = (b >> (4 * i)) & 0xF
+            if n:
+                grid[i >> 2][i & 3] = 1 << n
+        return grid
+
+    @grid.setter
+    def grid(self, grid):
+        b = 0
+        for i in range(16):
+            v = int(grid[i >> 2][i & 3])
+            if v:
+                b |= (v.bit_length() - 1) << (4 * i)
+        self.board = b
+
+    def clone(self):
+        """
+        Create a copy of the current game board.
+        Copying the packed integer is all that is needed.
+        """
+        return BitBoard(self.board)
+
+    def snapshot(self):
+        """
+        Capture the board state, which is just the packed integer.
+        """
+        return self.board
+
+    def restore(self, state):
+        """
+        Restore a state previously returned by snapshot().
+        """
+        self.board = state
+
+    def copy_from(self, other):
+        """
+        Copy the state of another BitBoard into this one.
+        """
+        self.board = other.board
+
+    def key(self):
+        """
+        Hashable key identifying the board position; the packed integer itself.
+        """
+        return self.board
+
+    def insert_tile(self, pos, value):
+        """
+        Insert a new tile at the specified position with the given value.
+        """
+        shift = 4 * (4 * pos[0] + pos[1])
+        n = int(value).bit_length() - 1 if value else 0
+        self.board = (self.board & ~(0xF << shift)) | (n << shift)
+
+    def get_available_cells(self):
+        """
+        Find all empty cells in the grid.
+        Returns a list of (x,y) coordinates of empty cells.
+        """
+        b = self.board
+        t0, t1, t2, t3 = empty_cells_tables
+        return list(t0[b & 0xFFFF] + t1[(b >> 16) & 0xFFFF] + t2[(b >> 32) & 0xFFFF] + t3[b >> 48])
+
+    def count_empty(self):
+        """
+        Number of empty cells, counted with bit operations on the packed board.
+        """
+        return int(count_empty_bitboard(self.board))
+
+    def get_max_tile(self):
+        """
+        Returns the value of the highest tile on the board.
+        """
+        return bitboard_max_tile(self.board)
+
+    def add_random_tile(self, rng):
+        """
+        Add a random tile (2 with 90% probability, 4 otherwise) to an empty cell,
+        drawing from the numpy Generator rng.
+        Returns False if there is no empty cell.
+        """
+        empty_cells = self.get_available_cells()
+        if not empty_cells:
+            return False
+
+        self.insert_tile(empty_cells[rng.integers(len(empty_cells))], 2 if rng.random() < 0.9 else 4)
+        return True
+
+    def move(self, dir):
+        """
+        Move tiles in the specified direction and merge when possible.
+        Same contract as GameBoard.move, implemented with row table lookups.
+        """
+        b = self.board
+        new = move_bitboard(b, dir)
+        self.board = new
+        return new != b, bitboard_move_score(b, dir)
+
+    def available_moves_mask(self):
+        """
+        Return the legal moves as a bit mask, bit d set if direction d is possible.
+        """
+        return bitboard_moves_mask(self.board)
+
+    def has_moves(self):
+        """
+        Whether any move is possible.
+        """
+        return bitboard_moves_mask(self.board) != 0
+
+    def get_available_moves(self, dirs=None):
+        """
+        Determine which moves are currently possible.
+        Returns a list of valid move directions (0: Up, 1: Down, 2: Left, 3: Right).
+        """
+        moves = moves_from_mask[self.available_moves_mask()]
+        if dirs is None:
+            return list(moves)
+        return [x for x in dirs if x in moves]
+
+    def get_cell_value(self, pos):
+        """
+        Get the value of the tile at the specified position.
+        """
+        n = (self.board >> (4 * (4 * pos[0] + pos[1]))) & 0xF
+        return 1 << n if n else 0
+
+def make_board(grid_len=4):
+    """
+    Create an empty board for the given grid size.
+    The classic 4x4 game uses the packed BitBoard, other sizes use the array-based GameBoard.
+    """
+    if grid_len == 4:
+        return BitBoard()
+    return GameBoard(grid_len)
@@ -1,17 +1,19 @@
 import tkinter as tk
 import numpy as np
 from tkinter import messagebox, simpledialog
-from random import randint
-import time
 from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
 
-from game_board import GameBoard
+from game_board import BitBoard, make_board
 from ai import AI, AIStrategy
 
 # Configuration constants
 DEFAULT_SIZE = 500  # Default window size in pixels
 DEFAULT_GRID_LEN = 4  # Default grid size (4x4 for classic 2048)
 GRID_PADDING = 10  # Padding between grid cells
+AI_POLL_INTERVAL = 1  # Milliseconds between checks for a finished AI search
+FRAME_INTERVAL = 1 / 30  # Minimum seconds between two redraws in continuous mode
+BATCH_DURATION = 0.016  # Seconds of AI moves the worker plays before handing them to Tk
 
 # UI color definitions
 BACKGROUND_COLOR_GAME = "#92877d"
@@ -22,6 +24,14 @@ BACKGROUND_COLOR_DICT = {   2:"#eee4da", 4:"#ede0c8", 8:"#f2b179", 16:"#f59563",
 CELL_COLOR_DICT = { 2:"#776e65", 4:"#776e65", 8:"#f9f6f2", 16:"#f9f6f2", \
                     32:"#f9f6f2", 64:"#f9f6f2", 128:"#f9f6f2", 256:"#f9f6f2", \
                     512:"#f9f6f2", 1024:"#f9f6f2", 2048:"#f9f6f2" }
+# Colors indexed by log2 of the tile value (0 for empty), tiles above 2048 use the 2048 colors
+BACKGROUND_COLORS = [BACKGROUND_COLOR_CELL_EMPTY] + [BACKGROUND_COLOR_DICT[1 << n] for n in range(1, 12)]
+CELL_COLORS = [None] + [CELL_COLOR_DICT[1 << n] for n in range(1, 12)]
+
+# Tk configure options of a cell, by log2 of its tile (0 for empty), passed straight
+# to tk.call so no option dict is built and converted per update
+CELL_OPTIONS = [("-text", "", "-bg", BACKGROUND_COLOR_CELL_EMPTY)] + \
+               [("-bg", BACKGROUND_COLORS[n], "-fg", CELL_COLORS[n]) for n in range(1, 12)]
 FONT = ("Verdana", 40, "bold")
 SCORE_FONT = ("Verdana", 16)
 
@@ -196,6 +206,16 @@ class GameGrid(tk.Frame):
         self.master.title('2048 AI')
         self.grid_cells = []
 
+        # Tile value currently shown by each cell, so unchanged cells are not reconfigured
+        self.grid_cells_state = []
+
+        # Key of the board last drawn and when, to skip and throttle redraws
+        self.drawn_board_key = None
+        self.last_draw_time = 0.0
+
+        # Whether a score label update is already scheduled
+        self.score_update_pending = False
+
         # Store the selected strategy, mode, and grid size
         self.strategy = strategy
         self.step_mode = step_mode
@@ -206,7 +226,6 @@ class GameGrid(tk.Frame):
 
         # Game tracking variables
         self.score = 0
-        self.move_times = []
         self.move_count = 0
         self.max_tile = 0
         self.game_over = False
@@ -219,9 +238,13 @@ class GameGrid(tk.Frame):
         self.score_frame = tk.Frame(master, bg=BACKGROUND_COLOR_GAME)
         self.score_frame.pack(fill=tk.X, padx=10, pady=5)
         
+        # The label shows score_var, which is only set when the text changes
+        self.score_text = f"Score: {int(self.score)}"
+        self.score_var = tk.StringVar(master, value=self.score_text)
+
         self.score_label = tk.Label(
             self.score_frame, 
-            text=f"Score: {int(self.score)}", 
+            textvariable=self.score_var, 
             font=SCORE_FONT, 
             bg=BACKGROUND_COLOR_GAME, 
             fg="white"
@@ -260,9 +283,17 @@ class GameGrid(tk.Frame):
         )
         self.step_btn.pack(side=tk.LEFT, padx=5)
 
+        # Random number generator for the new tiles of this game
+        self.rng = np.random.default_rng()
+
         # Initialize grid and game state
         self.init_grid()
         self.init_matrix()
+
+        # Classic 4x4 games draw straight from the packed board
+        if isinstance(self.board, BitBoard):
+            self.update_grid_cells = self.update_bitboard_cells
+
         self.update_grid_cells()
         
         # Pack the grid
@@ -271,6 +302,10 @@ class GameGrid(tk.Frame):
         # Initialize AI with selected strategy
         self.AI = AI(strategy=strategy)
 
+        # The AI searches in a worker thread so the window stays responsive
+        self.ai_executor = ThreadPoolExecutor(max_workers=1)
+        self.search_future = None
+
         # Bind key press for game over
         self.master.bind('<Key>', self.handle_key_press)
 
@@ -279,13 +314,20 @@ class GameGrid(tk.Frame):
         
         # Add a game start time
         self.game_start_time = perf_counter()
-        self.move_times = []
+
+        # AI calculation time of each move, in a buffer that doubles when full
+        self.move_times = np.empty(1 << 14)
+        self.move_times_count = 0
 
     def init_grid(self):
         """Initialize the visual grid with empty cells."""
         background = tk.Frame(self.master, bg=BACKGROUND_COLOR_GAME, width=self.size, height=self.size)
         background.pack(expand=True, fill=tk.BOTH)
 
+        # Adjust font size based on grid size
+        font_size = 40 if self.grid_len <= 6 else max(10, int(40 * (6 / self.grid_len)))
+        cell_font = ("Verdana", font_size, "bold")
+
         for i in range(self.grid_len):
             grid_row = []
 
@@ -297,53 +339,125 @@ class GameGrid(tk.Frame):
                 background.grid_rowconfigure(i, weight=1)
                 background.grid_columnconfigure(j, weight=1)
                 
-                # Adjust font size based on grid size
-                font_size = 40 if self.grid_len <= 6 else max(10, int(40 * (6 / self.grid_len)))
-                cell_font = ("Verdana", font_size, "bold")
-                
                 t = tk.Label(master=cell, text="", bg=BACKGROUND_COLOR_CELL_EMPTY, justify=tk.CENTER, font=cell_font, width=4, height=2)
                 t.pack(expand=True, fill=tk.BOTH)
                 grid_row.append(t)
 
             self.grid_cells.append(grid_row)
+            self.grid_cells_state.append([0] * self.grid_len)
+
+        # Cells in row-major order, the nibble order of a BitBoard
+        self.flat_cells = [cell for grid_row in self.grid_cells for cell in grid_row]
+        self.flat_cells_state = [0] * len(self.flat_cells)
 
     def init_matrix(self):
         """Initialize the game board with starting tiles."""
-        # Create a new GameBoard with custom grid length
-        self.board = GameBoard(self.grid_len)
+        # Create a new board with custom grid length
+        self.board = make_board(self.grid_len)
         self.add_random_tile()
         self.add_random_tile()
+        # Board the AI worker plays on, swapped with self.board after every turn
+        self.search_board = self.board.clone()
 
     def update_grid_cells(self):
         """Update the visual grid to match the current game state."""
+        # Nothing to do if the board has not changed since the last update
+        board_key = self.board.key()
+        if board_key == self.drawn_board_key:
+            return
+        self.drawn_board_key = board_key
+
+        # Read the grid once as nested lists, indexing them is much cheaper
+        # than indexing the ndarray (and a BitBoard decodes it on every access)
+        grid = self.board.grid.tolist()
+        call = self.tk.call
+
         for i in range(self.grid_len):
             for j in range(self.grid_len):
-                new_number = int(self.board.grid[i][j])
-                cell = self.grid_cells[i][j]
+                new_number = int(grid[i][j])
+
+                # Only reconfigure cells whose tile changed
+                if new_number == self.grid_cells_state[i][j]:
+                    continue
+                self.grid_cells_state[i][j] = new_number
+
+                path = str(self.grid_cells[i][j])
                 
                 if new_number == 0:
-                    # Minimal updates only when necessary
-                    if cell['text'] != "" or cell['bg'] != BACKGROUND_COLOR_CELL_EMPTY:
-                        cell.configure(text="", bg=BACKGROUND_COLOR_CELL_EMPTY)
+                    call(path, "configure", *CELL_OPTIONS[0])
                 else:
                     # Get appropriate colors based on tile value
-                    n = new_number
-                    c = min(new_number, 2048)
-                    
-                    cell.configure(
-                        text=str(n), 
-                        bg=BACKGROUND_COLOR_DICT.get(c, BACKGROUND_COLOR_DICT[2048]), 
-                        fg=CELL_COLOR_DICT.get(c, CELL_COLOR_DICT[2048])
-                    )
+                    c = min(new_number.bit_length() - 1, 11)
+                    call(path, "configure", "-text", str(new_number), *CELL_OPTIONS[c])
         
         # Update the display
         self.master.update_idletasks()
+
+    def update_bitboard_cells(self):
+        """update_grid_cells for a BitBoard: each tile is read from its nibble
+        (log2 of the value) instead of decoding the whole grid."""
+        b = self.board.board
+        if b == self.drawn_board_key:
+            return
+        self.drawn_board_key = b
+
+        state = self.flat_cells_state
+        call = self.tk.call
+        for k, cell in enumerate(self.flat_cells):
+            n = (b >> (4 * k)) & 0xF
+
+            # Only reconfigure cells whose tile changed
+            if n == state[k]:
+                continue
+            state[k] = n
+
+            path = str(cell)
+            if n == 0:
+                call(path, "configure", *CELL_OPTIONS[0])
+            else:
+                call(path, "configure", "-text", str(1 << n), *CELL_OPTIONS[min(n, 11)])
+
+        # Update the display
+        self.master.update_idletasks()
+
+    def refresh_display(self, force=False):
+        """Redraw the grid and score. Unless forced, consecutive moves within
+        FRAME_INTERVAL are drawn together by the first redraw after it."""
+        now = perf_counter()
+        if not force and now - self.last_draw_time < FRAME_INTERVAL:
+            return
+        self.last_draw_time = now
+
+        self.update_grid_cells()
+
+        # Repeated score changes before the next idle time share one label update
+        if not self.score_update_pending:
+            self.score_update_pending = True
+            self.master.after_idle(self.update_score_label)
+
+    def update_score_label(self):
+        """Show the current score."""
+        self.score_update_pending = False
+
+        score_text = f"Score: {int(self.score)}"
+        if score_text != self.score_text:
+            self.score_text = score_text
+            self.score_var.set(score_text)
     
+    def record_move_time(self, move_time):
+        """Store the AI calculation time of a move."""
+        if self.move_times_count == len(self.move_times):
+            self.move_times = np.resize(self.move_times, 2 * len(self.move_times))
+
+        self.move_times[self.move_times_count] = move_time
+        self.move_times_count += 1
+
     def show_game_stats(self):
         """Display game statistics in a new window."""
         # Calculate statistics
-        ai_total_time = sum(self.move_times)
-        ai_avg_time = ai_total_time / len(self.move_times) if self.move_times else 0
+        move_times = self.move_times[:self.move_times_count]
+        ai_total_time = move_times.sum()
+        ai_avg_time = move_times.mean() if self.move_times_count else 0
         
         # Calculate total game duration
         game_duration = perf_counter() - self.game_start_time
@@ -392,6 +506,9 @@ class GameGrid(tk.Frame):
         # Update button text
         if self.is_paused:
             self.pause_resume_btn.config(text="Resume")
+
+            # Show the moves not drawn yet
+            self.refresh_display(force=True)
         else:
             self.pause_resume_btn.config(text="Pause")
         
@@ -405,49 +522,20 @@ class GameGrid(tk.Frame):
         if self.game_over:
             messagebox.showinfo("Game Over", "The game has ended.")
             return
+
+        # A move is still being searched by the game loop
+        if self.search_future is not None:
+            return
         
         # Temporarily disable pause to allow the move
         was_paused = self.is_paused
         self.is_paused = False
         
         try:
-            # Store original grid for score calculation
-            original_grid = np.copy(self.board.grid)
-            
-            # Measure AI decision time
-            start_time = perf_counter()
-            
-            # Get AI move
-            move = self.AI.get_move(self.board)
-            
-            # Record move time
-            move_time = perf_counter() - start_time
-            self.move_times.append(move_time)
-            
-            # Apply move
-            self.board.move(move)
-            
-            # Calculate and add score from move
-            move_score = self.board.calculate_move_score(original_grid)
-            self.score += move_score
-            
-            # Increment move counter
-            self.move_count += 1
-            
-            # Add random tile
-            self.add_random_tile()
+            # Get AI move and play it
+            self.record_moves([self.play_one_move(self.board)])
     
-            # Update max tile
-            current_max_tile = self.board.get_max_tile()
-            self.max_tile = max(self.max_tile, current_max_tile)
-            
-            # Update grid and score display
-            self.update_grid_cells()
-            self.score_label.config(text=f"Score: {int(self.score)}")
-    
-            # Check game over condition
-            if len(self.board.get_available_moves()) == 0:
-                self.game_over = True
+            if self.game_over:
                 messagebox.showinfo("Game Over", f"Game ended! Final score: {int(self.score)}")
                 self.show_game_stats()
         
@@ -472,44 +560,49 @@ class GameGrid(tk.Frame):
         if self.step_mode and self.waiting_for_step:
             self.waiting_for_step = False
         
+        # Play on a copy of the board, the AI moves it around while searching
+        self.search_board.copy_from(self.board)
+        self.search_future = self.ai_executor.submit(self.play_moves, self.search_board)
+        self.master.after(AI_POLL_INTERVAL, self.poll_move)
+
+    def play_one_move(self, board):
+        """Search the AI move for board, play it and add a random tile.
+        Returns the time the search took and the score of the move."""
+        start_time = perf_counter()
+        move = self.AI.get_move(board)
+        move_time = perf_counter() - start_time
+        _, move_score = board.move(move)
+        board.add_random_tile(self.rng)
+        return move_time, move_score
+
+    def play_moves(self, board):
+        """Play AI moves on board (in the worker thread) for up to BATCH_DURATION,
+        so that fast searches are applied many at a time instead of one per Tk tick.
+        Step mode and pausing stop the batch after the current move.
+        Returns the board with the list of (move time, move score) of its moves."""
+        moves = []
+        start_time = perf_counter()
+        while True:
+            moves.append(self.play_one_move(board))
+            if (self.step_mode or self.is_paused or not board.has_moves()
+                    or perf_counter() - start_time >= BATCH_DURATION):
+                return board, moves
+
+    def poll_move(self):
+        """Apply the moves once the AI has played them, then continue the game loop."""
+        if not self.search_future.done():
+            self.master.after(AI_POLL_INTERVAL, self.poll_move)
+            return
+
+        future = self.search_future
+        self.search_future = None
+
         try:
-            # Store original grid for score calculation
-            original_grid = np.copy(self.board.grid)
-            
-            # Measure AI decision time
-            start_time = perf_counter()
-            
-            # Get AI move
-            move = self.AI.get_move(self.board)
-            
-            # Record move time
-            move_time = perf_counter() - start_time
-            self.move_times.append(move_time)
-            
-            # Apply move
-            self.board.move(move)
-            
-            # Calculate and add score from move
-            move_score = self.board.calculate_move_score(original_grid)
-            self.score += move_score
-            
-            # Increment move counter
-            self.move_count += 1
-            
-            # Add random tile
-            self.add_random_tile()
-    
-            # Update max tile
-            current_max_tile = self.board.get_max_tile()
-            self.max_tile = max(self.max_tile, current_max_tile)
-            
-            # Update grid and score display
-            self.update_grid_cells()
-            self.score_label.config(text=f"Score: {int(self.score)}")
-    
-            # Check game over condition
-            if len(self.board.get_available_moves()) == 0:
-                self.game_over = True
+            board, moves = future.result()
+            self.search_board, self.board = self.board, board
+            self.record_moves(moves)
+
+            if self.game_over:
                 self.master.after(200, self.show_game_over)
                 return
     
@@ -518,12 +611,35 @@ class GameGrid(tk.Frame):
             return
         
         # Scheduling next move based on game mode
+        # after_idle lets pending key presses and repaints run first
         if not self.step_mode:
-            self.master.after(0, self.run_game)
+            self.master.after_idle(self.run_game)
         else:
             # In step mode, wait until manually stepped
             pass
         
+    def record_moves(self, moves):
+        """Account for the moves just played on the board: record their calculation
+        times and scores, check for game over and refresh the display."""
+        for move_time, move_score in moves:
+            self.record_move_time(move_time)
+            self.score += move_score
+        
+        # Increment move counter
+        self.move_count += len(moves)
+
+        # Update max tile, tiles never shrink so the final board holds the batch maximum
+        current_max_tile = self.board.get_max_tile()
+        self.max_tile = max(self.max_tile, current_max_tile)
+        
+        # Check game over condition
+        if not self.board.has_moves():
+            self.game_over = True
+
+        # Update grid and score display; every move is shown in step mode and at the end,
+        # and moves landing after a pause are drawn since nothing redraws while paused
+        self.refresh_display(force=self.step_mode or self.game_over or self.is_paused)
+
     def show_game_over(self):
         """Show game over dialog and statistics."""
         messagebox.showinfo("Game Over", f"Game ended! Final score: {int(self.score)}")
@@ -531,18 +647,7 @@ class GameGrid(tk.Frame):
     
     def add_random_tile(self):
         """Add a random tile (2 or 4) to an empty cell."""
-        empty_cells = self.board.get_available_cells()
-            
-        if not empty_cells:
-            return False
-            
-        # 90% chance of 2, 10% chance of 4
-        new_tile_value = 2 if randint(0, 10) < 9 else 4
-        chosen_cell = empty_cells[randint(0, len(empty_cells) - 1)]
-            
-        # Insert tile and update board
-        self.board.insert_tile(chosen_cell, new_tile_value)
-        return True
+        return self.board.add_random_tile(self.rng)
         
     def handle_key_press(self, event):
         """Handle key press for game control."""